@@ -0,0 +1,8 @@
+"""Offline benchmark suite for the MotionEdit backend.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --threshold 0.2
+    python -m benchmarks.startup --samples 10
+"""
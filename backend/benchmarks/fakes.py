@@ -0,0 +1,165 @@
+"""In-memory stand-ins for Motor and LlmChat so benchmarks run without network access"""
+import json
+import uuid
+from typing import Any, Dict, List, Optional
+
+
+OPERATORS = {
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$in": lambda value, operand: value in operand,
+}
+
+
+def matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Equality matches plus the $gt/$gte/$in operators used by server.py"""
+    for key, condition in query.items():
+        value = document.get(key)
+        if isinstance(condition, dict) and condition and all(op in OPERATORS for op in condition):
+            if not all(OPERATORS[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply an inclusion projection ({"field": 1, "_id": 0}); other shapes return the full document"""
+    if not projection:
+        return dict(document)
+    included = [key for key, value in projection.items() if value and key != '_id']
+    result = {key: document[key] for key in included if key in document} if included else dict(document)
+    if projection.get('_id', 1) and '_id' in document:
+        result['_id'] = document['_id']
+    elif not projection.get('_id', 1):
+        result.pop('_id', None)
+    return result
+
+
+class InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class UpdateResult:
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+        self.modified_count = matched_count
+
+
+class DeleteResult:
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents if length is None else self.documents[:length]
+
+    def __aiter__(self):
+        self._iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    """Subset of AsyncIOMotorCollection used by server.py.
+
+    Documents are returned as shallow copies: the server never mutates nested values of
+    what it reads, and a deep copy would dominate timings for multi-megabyte documents.
+    """
+
+    def __init__(self):
+        self.documents: List[Dict[str, Any]] = []
+        self.indexes = set()
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None):
+        query = query or {}
+        return FakeCursor([project(doc, projection) for doc in self.documents if matches(doc, query)])
+
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
+        for document in self.documents:
+            if matches(document, query):
+                return project(document, projection)
+        return None
+
+    async def insert_one(self, document: Dict[str, Any]):
+        # Like pymongo, insert_one adds _id to the caller's document
+        document.setdefault('_id', uuid.uuid4().hex)
+        self.documents.append(dict(document))
+        return InsertOneResult(document['_id'])
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any]):
+        for document in self.documents:
+            if matches(document, query):
+                document.update(update.get('$set', {}))
+                return UpdateResult(1)
+        return UpdateResult(0)
+
+    async def distinct(self, key: str, query: Optional[Dict[str, Any]] = None):
+        query = query or {}
+        return list({doc[key] for doc in self.documents if key in doc and matches(doc, query)})
+
+    async def create_index(self, keys, **kwargs):
+        keys = [(keys, 1)] if isinstance(keys, str) else keys
+        name = "_".join(f"{key}_{direction}" for key, direction in keys)
+        self.indexes.add(name)
+        return name
+
+    async def estimated_document_count(self):
+        return len(self.documents)
+
+    async def delete_one(self, query: Dict[str, Any]):
+        for position, document in enumerate(self.documents):
+            if matches(document, query):
+                del self.documents[position]
+                return DeleteResult(1)
+        return DeleteResult(0)
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    async def command(self, name: str, **kwargs):
+        # Standalone servers report no operationTime, which is what the stand-in mimics
+        return {"ok": 1.0}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self.collections:
+            self.collections[name] = FakeCollection()
+        return self.collections[name]
+
+
+class FakeUserMessage:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeLlmChat:
+    """Echoes the Lottie JSON from the prompt back inside a ```json fence, like a cooperative model"""
+
+    def __init__(self, api_key: str = "", session_id: str = "", system_message: str = ""):
+        self.session_id = session_id
+
+    def with_model(self, provider: str, model: str):
+        return self
+
+    async def send_message(self, message: FakeUserMessage) -> str:
+        text = message.text
+        start = text.index("CURRENT LOTTIE JSON:\n") + len("CURRENT LOTTIE JSON:\n")
+        end = text.index("\n\nINSTRUCTIONS:")
+        return "```json\n" + json.dumps(json.loads(text[start:end])) + "\n```"
@@ -0,0 +1,117 @@
+"""Deterministic generator for synthetic Lottie documents of a target size"""
+import json
+import random
+from typing import Any, Dict, List
+
+WORDS = ["BET", "Lottieshot", "2019", "Sale", "Happy", "Birthday", "Launch", "Welcome",
+         "Summer", "Offer", "Motion", "Studio", "Today", "Only", "New", "Edition"]
+
+
+def animated_value(rng: random.Random, dimensions: int, frames: int, keyframes: int) -> Dict[str, Any]:
+    """A keyframed property ({"a": 1, "k": [...]}) with bezier easing, as exported by Bodymovin"""
+    step = max(frames // keyframes, 1)
+    return {
+        "a": 1,
+        "k": [
+            {
+                "i": {"x": [0.667] * dimensions, "y": [1] * dimensions},
+                "o": {"x": [0.333] * dimensions, "y": [0] * dimensions},
+                "t": index * step,
+                "s": [round(rng.uniform(0, 500), 3) for _ in range(dimensions)],
+            }
+            for index in range(keyframes)
+        ],
+    }
+
+
+def shape_layer(rng: random.Random, index: int, frames: int) -> Dict[str, Any]:
+    vertices = rng.randint(4, 12)
+    return {
+        "ddd": 0, "ind": index, "ty": 4, "nm": f"Shape Layer {index}", "sr": 1,
+        "ks": {
+            "o": {"a": 0, "k": 100},
+            "r": animated_value(rng, 1, frames, 3),
+            "p": animated_value(rng, 3, frames, 4),
+            "a": {"a": 0, "k": [0, 0, 0]},
+            "s": {"a": 0, "k": [100, 100, 100]},
+        },
+        "ao": 0,
+        "shapes": [{
+            "ty": "gr", "nm": "Group 1",
+            "it": [
+                {"ty": "sh", "nm": "Path 1", "ks": {"a": 0, "k": {
+                    "i": [[round(rng.uniform(-20, 20), 3), round(rng.uniform(-20, 20), 3)] for _ in range(vertices)],
+                    "o": [[round(rng.uniform(-20, 20), 3), round(rng.uniform(-20, 20), 3)] for _ in range(vertices)],
+                    "v": [[round(rng.uniform(-200, 200), 3), round(rng.uniform(-200, 200), 3)] for _ in range(vertices)],
+                    "c": True,
+                }}},
+                {"ty": "fl", "nm": "Fill 1", "c": {"a": 0, "k": [rng.random(), rng.random(), rng.random(), 1]},
+                 "o": {"a": 0, "k": 100}, "r": 1},
+                {"ty": "st", "nm": "Stroke 1", "c": {"a": 0, "k": [rng.random(), rng.random(), rng.random(), 1]},
+                 "o": {"a": 0, "k": 100}, "w": {"a": 0, "k": 2}},
+                {"ty": "tr", "p": {"a": 0, "k": [0, 0]}, "a": {"a": 0, "k": [0, 0]},
+                 "s": {"a": 0, "k": [100, 100]}, "r": {"a": 0, "k": 0}, "o": {"a": 0, "k": 100}},
+            ],
+        }],
+        "ip": 0, "op": frames, "st": 0, "bm": 0,
+    }
+
+
+def text_layer(rng: random.Random, index: int, frames: int, flat_text: bool = False) -> Dict[str, Any]:
+    """A text layer; flat_text writes t.d.k.s as a plain string, the shape make_simple_modifications deletes"""
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+    if index % 16 == 1:
+        # Guarantee some layers for the "delete BET" fallback to remove
+        text = f"BET {text}"
+    if flat_text:
+        document = {"k": {"s": text}}
+    else:
+        document = {"k": [{"s": {"s": 48, "f": "Roboto-Bold", "t": text, "j": 2, "tr": 0,
+                                 "lh": 57.6, "ls": 0, "fc": [1, 1, 1]}, "t": 0}]}
+    return {
+        "ddd": 0, "ind": index, "ty": 5, "nm": text, "sr": 1,
+        "ks": {
+            "o": {"a": 0, "k": 100},
+            "p": animated_value(rng, 3, frames, 2),
+            "a": {"a": 0, "k": [0, 0, 0]},
+            "s": {"a": 0, "k": [100, 100, 100]},
+        },
+        "t": {
+            "d": document,
+            "p": {}, "m": {"g": 1, "a": {"a": 0, "k": [0, 0]}}, "a": [],
+        },
+        "ip": 0, "op": frames, "st": 0, "bm": 0,
+    }
+
+
+def generate_lottie(target_bytes: int, seed: int = 0, flat_text: bool = False) -> Dict[str, Any]:
+    """Build a Lottie document whose compact JSON encoding is at least target_bytes long.
+
+    Text layers use Bodymovin's keyframed t.d.k list unless flat_text is set (see text_layer).
+    """
+    rng = random.Random(seed)
+    frames = 120
+    document = {
+        "v": "5.7.4", "fr": 30, "ip": 0, "op": frames, "w": 1080, "h": 1080,
+        "nm": f"Synthetic {target_bytes} bytes", "ddd": 0, "assets": [],
+        "fonts": {"list": [{"fName": "Roboto-Bold", "fFamily": "Roboto", "fStyle": "Bold", "ascent": 75}]},
+        "layers": [],
+    }
+    layers: List[Dict[str, Any]] = document["layers"]
+    size = len(json.dumps(document))
+    index = 1
+    while size < target_bytes:
+        layer = text_layer(rng, index, frames, flat_text) if index % 8 == 1 else shape_layer(rng, index, frames)
+        layers.append(layer)
+        size += len(json.dumps(layer)) + 2
+        index += 1
+    return document
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like '10k', '1.5m' or '2048' into bytes"""
+    value = value.strip().lower()
+    multipliers = {"k": 1024, "m": 1024 * 1024}
+    if value and value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
@@ -0,0 +1,225 @@
+"""Benchmark the backend hot paths in-process and optionally compare against a saved baseline.
+
+The FastAPI app is driven through httpx's ASGI transport with an in-memory Mongo stand-in
+and a fake LlmChat, so results depend only on this process and are reproducible offline.
+
+    python -m benchmarks.run --sizes 10k,100k,1m,20m --output results.json
+    python -m benchmarks.run --baseline results.json --threshold 0.2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from .fakes import FakeDatabase, FakeLlmChat, FakeUserMessage
+from .lottie_gen import generate_lottie, parse_size
+
+DEFAULT_SIZES = "10k,100k,1m,5m,20m"
+LIST_BYTES_BUDGET = 64 * 1024 * 1024  # Cap on total library bytes seeded for the list benchmark
+FALLBACK_PROMPTS = {
+    "color": "change color to red",
+    "replace": "replace 2019 with 2024",
+    "delete": "delete BET",
+}
+
+
+def load_server():
+    """Import server.py with the database and LLM client swapped for in-memory fakes"""
+    os.environ.setdefault('GOOGLE_API_KEY', 'benchmark')
+    import server
+    server.db = FakeDatabase()
+    server.LlmChat = FakeLlmChat
+    server.UserMessage = FakeUserMessage
+    return server
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def measure(func: Callable[[], Awaitable[Any]], min_iterations: int, max_iterations: int,
+                  min_seconds: float) -> List[float]:
+    """Run func after one warm-up call until both the iteration and time minimums are met"""
+    await func()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_iterations and (
+            len(timings) < min_iterations or time.perf_counter() - started < min_seconds):
+        start = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(name: str, size_bytes: int, timings: List[float], **extra) -> Dict[str, Any]:
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        "name": name,
+        "size_bytes": size_bytes,
+        "iterations": len(ordered),
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "mean_ms": total / len(ordered) * 1000,
+        "min_ms": ordered[0] * 1000,
+        "ops_per_sec": len(ordered) / total if total else 0.0,
+        "mb_per_sec": size_bytes * len(ordered) / total / (1024 * 1024) if total else 0.0,
+        **extra,
+    }
+
+
+def as_async(func: Callable[[], Any]) -> Callable[[], Awaitable[Any]]:
+    async def wrapper():
+        return func()
+    return wrapper
+
+
+async def run_size(server, http, size_bytes: int, library_size: int, args) -> List[Dict[str, Any]]:
+    """Benchmark every case against documents of roughly size_bytes"""
+    document = generate_lottie(size_bytes, seed=args.seed)
+    encoded = json.dumps(document).encode()
+    actual_size = len(encoded)
+    documents = max(1, min(library_size, LIST_BYTES_BUDGET // actual_size))
+
+    server.db = FakeDatabase()
+    server.search_index.clear()
+    ids = []
+    for index in range(documents):
+        response = await http.post("/api/animations", content=json.dumps(
+            {"name": f"Benchmark {index}", "url": "", "animationData": document}).encode(),
+            headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+        ids.append(response.json()["id"])
+    target_id = ids[0]
+
+    def http_case(method: str, path: str, body: bytes = None):
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+
+        async def call():
+            response = await http.request(method, path, content=body, headers=headers)
+            response.raise_for_status()
+            return response
+        return call
+
+    cases = {
+        "api.list": (http_case("GET", "/api/animations"), {"documents": documents}),
+        "api.get": (http_case("GET", f"/api/animations/{target_id}"), {}),
+        "api.update": (http_case("PUT", f"/api/animations/{target_id}",
+                                 b'{"animationData": ' + encoded + b'}'), {}),
+        "api.export_json": (http_case("POST", "/api/export", b'{"format": "json", "animationId": "'
+                                      + target_id.encode() + b'", "animationData": ' + encoded + b'}'), {}),
+        "api.ai_edit": (http_case("POST", "/api/animations/edit", b'{"prompt": "keep as is", "animationId": "'
+                                  + target_id.encode() + b'", "animationData": ' + encoded + b'}'), {}),
+        "api.export_lottie": (http_case("POST", "/api/export", b'{"format": "lottie", "animationId": "'
+                                        + target_id.encode() + b'"}'), {}),
+    }
+
+    stored = server.Animation(name="Benchmark", url="", animationData=document).dict()
+    prepared = server.prepare_for_mongo(stored)
+    cases["codec.prepare_for_mongo"] = (as_async(lambda: server.prepare_for_mongo(stored)), {})
+    cases["codec.parse_from_mongo"] = (as_async(lambda: server.parse_from_mongo(prepared)), {})
+    cases["export.dotlottie_build"] = (as_async(
+        lambda: b"".join(server.DotLottieExport(target_id, document).iter_archive())), {})
+    # The delete branch only matches text layers whose t.d.k.s is a plain string
+    flat_text_document = generate_lottie(size_bytes, seed=args.seed, flat_text=True)
+    for label, prompt in FALLBACK_PROMPTS.items():
+        source = flat_text_document if label == "delete" else document
+        cases[f"fallback.{label}"] = (
+            as_async(lambda prompt=prompt, source=source: server.make_simple_modifications(source, prompt)), {})
+
+    results = []
+    for name, (func, extra) in cases.items():
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        timings = await measure(func, args.min_iterations, args.max_iterations, args.min_seconds)
+        result = summarize(name, actual_size, timings, **extra)
+        results.append(result)
+        print(f"{name:<28} {actual_size / 1024:>10.0f} KB  p50 {result['p50_ms']:>10.2f} ms  "
+              f"p99 {result['p99_ms']:>10.2f} ms  {result['ops_per_sec']:>9.1f} ops/s", flush=True)
+    return results
+
+
+async def run(args) -> Dict[str, Any]:
+    import httpx
+
+    server = load_server()
+    transport = httpx.ASGITransport(app=server.app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as http:
+        for size in args.sizes.split(','):
+            results.extend(await run_size(server, http, parse_size(size), args.library_size, args))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": args.sizes,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every case whose p50 regressed by more than threshold"""
+    previous = {(result["name"], result["size_bytes"]): result for result in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["name"], result["size_bytes"]))
+        if not before or not before["p50_ms"]:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{result['name']} @ {result['size_bytes']} bytes: p50 "
+                               f"{before['p50_ms']:.2f} ms -> {result['p50_ms']:.2f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MotionEdit backend hot paths")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated document sizes, e.g. 10k,1m,20m")
+    parser.add_argument("--library-size", type=int, default=10, help="Animations seeded for the list benchmark")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--max-iterations", type=int, default=200)
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Minimum time spent per case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", action="append", help="Only run cases whose name starts with this prefix")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown before failing")
+    parser.add_argument("--verbose", action="store_true", help="Keep server logging enabled")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Saved {len(report['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.threshold)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
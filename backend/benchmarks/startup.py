@@ -0,0 +1,109 @@
+"""Measure cold-start cost: module import, app construction, lifespan startup and first request.
+
+Each sample runs in a fresh interpreter so nothing is already imported or cached.
+
+    python -m benchmarks.startup --samples 10 --output startup_results.json
+    python -m benchmarks.startup --baseline startup_results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .run import compare, summarize
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PHASES = ["import", "create_app", "lifespan_startup", "first_request", "llm_first_use"]
+
+# Runs inside the child interpreter and prints one JSON object of phase timings in seconds
+PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+import server
+timings = {"import": time.perf_counter() - start}
+
+from benchmarks.fakes import FakeDatabase
+import httpx
+
+async def main():
+    start = time.perf_counter()
+    app = server.create_app(database=FakeDatabase())
+    timings["create_app"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["lifespan_startup"] = time.perf_counter() - start
+        start = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+            (await http.get("/api/")).raise_for_status()
+        timings["first_request"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        server.load_llm_client()
+        timings["llm_first_use"] = time.perf_counter() - start
+    except ImportError:
+        pass
+
+asyncio.run(main())
+print(json.dumps(timings))
+"""
+
+
+def sample() -> dict:
+    env = {**os.environ, "CACHE_INVALIDATION_MODE": "off"}
+    completed = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+                               capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MotionEdit backend cold start")
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown before failing")
+    args = parser.parse_args(argv)
+
+    samples = [sample() for _ in range(args.samples)]
+    results = []
+    for phase in PHASES:
+        timings = [timing[phase] for timing in samples if phase in timing]
+        if not timings:
+            continue
+        result = summarize(f"startup.{phase}", 0, timings)
+        results.append(result)
+        print(f"{result['name']:<28} p50 {result['p50_ms']:>10.2f} ms  p99 {result['p99_ms']:>10.2f} ms")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "samples": args.samples,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Saved {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.threshold)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,31 +1,46 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi import routing as fastapi_routing
+from fastapi.routing import APIRoute
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure, PyMongoError
 import os
 import logging
 import asyncio
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 import json
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+import re
+import bisect
+import time
+from contextlib import asynccontextmanager, contextmanager
+from collections import OrderedDict
+import base64
+import hashlib
+import zipfile
+import functools
+import threading
+from contextvars import ContextVar
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened by the app lifespan (see create_app)
+client: Optional[AsyncIOMotorClient] = None
+db = None
 
-# Create the main app without a prefix
-app = FastAPI()
+# LLM SDK classes, imported on the first AI edit by load_llm_client()
+LlmChat = None
+UserMessage = None
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+# Background task that primes caches after startup (see warm_caches)
+cache_warmup: Optional[asyncio.Task] = None
 
 # Models
 class Animation(BaseModel):
@@ -75,9 +90,24 @@ class AIEditResponse(BaseModel):
     animationData: Dict[str, Any]
     message: str
 
+class AnimationSummary(BaseModel):
+    id: str
+    name: str
+    thumbnail: Optional[str] = None
+    isProject: bool = False
+    updated_at: Optional[datetime] = None
+    score: float
+
+class AnimationSearchResponse(BaseModel):
+    query: str
+    total: int
+    offset: int
+    limit: int
+    results: List[AnimationSummary]
+
 class ExportRequest(BaseModel):
-    animationData: Dict[str, Any]
-    format: str  # 'mp4', 'gif', 'json'
+    animationData: Optional[Dict[str, Any]] = None  # Defaults to the stored document
+    format: str  # 'mp4', 'gif', 'json', 'lottie'
     animationId: str
 
 # Helper functions
@@ -116,6 +146,873 @@ def parse_from_mongo(item):
         return result
     return item
 
+# Metrics
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', '1.0'))
+# Directory shared by all worker processes; each saves its metrics there and /metrics sums them.
+# Required when running several workers, e.g. `uvicorn --workers 4`; empty it before starting.
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5.0'))
+
+def worker_count() -> int:
+    """Number of uvicorn worker processes (uvicorn reads WEB_CONCURRENCY too)"""
+    return int(os.environ.get('WEB_CONCURRENCY', '1'))
+
+def escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labelnames, labelvalues, extra=()) -> str:
+    """Render a Prometheus label set, e.g. {route="/api/animations",le="0.1"}"""
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in pairs) + "}"
+
+class Counter:
+    """Prometheus-style counter keyed by label values.
+
+    Updated from the event loop and from threadpool workers, so updates take a lock.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def samples(self) -> Dict[tuple, float]:
+        with self.lock:
+            return dict(self.values)
+
+    def merge_samples(self, total: Dict[tuple, float], samples: Dict[tuple, float]):
+        for key, value in samples.items():
+            total[key] = total.get(key, 0.0) + value
+
+    def render(self, samples: Optional[Dict[tuple, float]] = None) -> List[str]:
+        samples = self.samples() if samples is None else samples
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(samples.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by label values.
+
+    Observed from the event loop and from threadpool workers, so updates take a lock.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[tuple, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        position = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            if position < len(self.buckets):
+                series["buckets"][position] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block (also usable as a decorator)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Dict[tuple, Dict[str, Any]]:
+        with self.lock:
+            return {key: {**series, "buckets": list(series["buckets"])} for key, series in self.series.items()}
+
+    def merge_samples(self, total: Dict[tuple, Dict[str, Any]], samples: Dict[tuple, Dict[str, Any]]):
+        for key, series in samples.items():
+            merged = total.get(key)
+            if merged is None:
+                total[key] = {**series, "buckets": list(series["buckets"])}
+                continue
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], series["buckets"])]
+            merged["sum"] += series["sum"]
+            merged["count"] += series["count"]
+
+    def render(self, samples: Optional[Dict[tuple, Dict[str, Any]]] = None) -> List[str]:
+        samples = self.samples() if samples is None else samples
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(samples.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["buckets"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(self.labelnames, key, [('le', '+Inf')])} {series['count']}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {series['sum']}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+HTTP_REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status"))
+MONGO_LATENCY = Histogram(
+    "mongo_operation_duration_seconds", "MongoDB call latency by operation", ("operation",))
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "Latency of the LLM call in process_ai_edit", ("model",))
+JSON_LATENCY = Histogram(
+    "json_codec_duration_seconds", "JSON encode/decode latency by call site", ("operation", "route"))
+FALLBACK_LATENCY = Histogram(
+    "ai_fallback_duration_seconds", "Latency of make_simple_modifications")
+AI_EDIT_OUTCOMES = Counter(
+    "ai_edit_outcomes_total", "AI edit results by outcome", ("outcome",))
+SLOW_REQUESTS = Counter(
+    "http_slow_requests_total", "Requests slower than SLOW_REQUEST_SECONDS", ("method", "route"))
+EXPORT_CACHE_LOOKUPS = Counter(
+    "dotlottie_cache_lookups_total", "dotLottie export cache lookups by result", ("result",))
+
+METRICS = [HTTP_REQUEST_LATENCY, MONGO_LATENCY, LLM_LATENCY, JSON_LATENCY,
+           FALLBACK_LATENCY, AI_EDIT_OUTCOMES, SLOW_REQUESTS, EXPORT_CACHE_LOOKUPS]
+
+def metrics_snapshot_path(pid: Optional[int] = None) -> Path:
+    return Path(METRICS_MULTIPROC_DIR) / f"metrics_{pid or os.getpid()}.json"
+
+def write_metrics_snapshot():
+    """Save this worker's metrics to METRICS_MULTIPROC_DIR for whichever worker serves /metrics"""
+    snapshot = {metric.name: [[list(key), value] for key, value in metric.samples().items()] for metric in METRICS}
+    path = metrics_snapshot_path()
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(snapshot))
+    os.replace(temporary, path)
+
+def aggregate_metric_samples() -> Dict[str, Dict[tuple, Any]]:
+    """Sum this worker's live metrics with the snapshots saved by the other workers.
+
+    Snapshots of workers that have exited are kept, so counters never go backwards.
+    """
+    totals = {metric.name: metric.samples() for metric in METRICS}
+    own_snapshot = metrics_snapshot_path().name
+    for path in Path(METRICS_MULTIPROC_DIR).glob("metrics_*.json"):
+        if path.name == own_snapshot:
+            continue
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logging.warning(f"Skipping unreadable metrics snapshot {path.name}: {e}")
+            continue
+        for metric in METRICS:
+            samples = {tuple(key): value for key, value in snapshot.get(metric.name, [])}
+            metric.merge_samples(totals[metric.name], samples)
+    return totals
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format, summed across workers if configured"""
+    samples = aggregate_metric_samples() if METRICS_MULTIPROC_DIR else {}
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render(samples.get(metric.name)))
+    return "\n".join(lines) + "\n"
+
+async def flush_metrics():
+    """Periodically save this worker's metrics so /metrics on another worker includes them"""
+    while True:
+        await asyncio.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            write_metrics_snapshot()
+        except OSError as e:
+            logging.warning(f"Could not save metrics snapshot: {e}")
+
+async def timed_mongo(operation: str, awaitable):
+    """Await a Motor call while recording its latency"""
+    with MONGO_LATENCY.time(operation=operation):
+        return await awaitable
+
+serialize_started: ContextVar[Optional[float]] = ContextVar("serialize_started", default=None)
+
+def mark_serialize_started(serialize_response):
+    """Wrap fastapi.routing.serialize_response to record when response encoding begins"""
+    @functools.wraps(serialize_response)
+    async def wrapper(*args, **kwargs):
+        serialize_started.set(time.perf_counter())
+        return await serialize_response(*args, **kwargs)
+    wrapper.marks_serialize_started = True
+    return wrapper
+
+# The request handler looks serialize_response up as a module global on every call
+if not getattr(fastapi_routing.serialize_response, 'marks_serialize_started', False):
+    fastapi_routing.serialize_response = mark_serialize_started(fastapi_routing.serialize_response)
+
+class TimedRoute(APIRoute):
+    """APIRoute that records response serialization time in JSON_LATENCY.
+
+    Everything from serialize_response starting to the response being ready is FastAPI
+    validating the return value against response_model, serializing it and rendering it
+    with json.dumps, observed as operation="response_encode". Endpoints that return a
+    Response themselves skip serialization and are not observed.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            serialize_started.set(None)
+            response = await handler(request)
+            started = serialize_started.get()
+            if started is not None:
+                JSON_LATENCY.observe(time.perf_counter() - started, operation="response_encode", route=self.path)
+            return response
+
+        return timed_handler
+
+# Search index
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+SEARCH_FIELD_WEIGHTS = {"name": 2.0, "text": 1.0}
+SEARCH_MATCH_WEIGHTS = {"exact": 3.0, "prefix": 2.0, "fuzzy": 1.0}
+SEARCH_MAX_EXPANSIONS = 50  # Cap on terms a single prefix/fuzzy query token may expand to
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+def extract_text_layer_strings(animation_data: Any) -> List[str]:
+    """Collect the strings shown by text layers (ty: 5), including those inside precomp assets"""
+    strings = []
+
+    def walk(obj):
+        if isinstance(obj, dict):
+            if obj.get('ty') == 5 and isinstance(obj.get('t'), dict):
+                keyframes = obj['t'].get('d', {}).get('k')
+                # Keyframed text is a list of {s: {t: ...}}; older files use a single {s: ...}
+                if isinstance(keyframes, dict):
+                    keyframes = [keyframes]
+                for keyframe in keyframes if isinstance(keyframes, list) else []:
+                    document = keyframe.get('s') if isinstance(keyframe, dict) else None
+                    if isinstance(document, dict) and isinstance(document.get('t'), str):
+                        strings.append(document['t'])
+                    elif isinstance(document, str):
+                        strings.append(document)
+            for value in obj.values():
+                if isinstance(value, (dict, list)):
+                    walk(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                walk(item)
+
+    walk(animation_data)
+    return strings
+
+def deletion_variants(term: str) -> List[str]:
+    """All strings one character deletion away from term (used for fuzzy lookups)"""
+    return [term[:i] + term[i + 1:] for i in range(len(term))]
+
+class SearchIndex:
+    """In-memory inverted index over animation names and text-layer contents.
+
+    Maintained incrementally on every write so queries never scan the collection.
+    Fuzzy matching uses a deletion neighbourhood (edit distance 1), so lookups stay
+    proportional to query length rather than vocabulary size.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.vocabulary: List[str] = []  # Sorted, for prefix range lookups
+        self.deletions: Dict[str, set] = {}
+
+    def __len__(self):
+        return len(self.summaries)
+
+    def _add_term(self, term: str):
+        bisect.insort(self.vocabulary, term)
+        for variant in [term] + deletion_variants(term):
+            self.deletions.setdefault(variant, set()).add(term)
+
+    def _drop_term(self, term: str):
+        position = bisect.bisect_left(self.vocabulary, term)
+        if position < len(self.vocabulary) and self.vocabulary[position] == term:
+            del self.vocabulary[position]
+        for variant in [term] + deletion_variants(term):
+            terms = self.deletions.get(variant)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self.deletions[variant]
+
+    def add(self, animation: Dict[str, Any]):
+        """Index (or re-index) an animation document"""
+        animation_id = animation.get('id')
+        if not animation_id:
+            return
+        self.remove(animation_id)
+
+        weights: Dict[str, float] = {}
+        for token in tokenize(animation.get('name', '')):
+            weights[token] = max(weights.get(token, 0.0), SEARCH_FIELD_WEIGHTS['name'])
+        for text in extract_text_layer_strings(animation.get('animationData') or {}):
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0.0), SEARCH_FIELD_WEIGHTS['text'])
+
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self._add_term(term)
+            self.postings[term][animation_id] = weight
+        self.doc_terms[animation_id] = weights
+        self.summaries[animation_id] = {
+            "id": animation_id,
+            "name": animation.get('name', ''),
+            "thumbnail": animation.get('thumbnail'),
+            "isProject": animation.get('isProject', False),
+            "updated_at": animation.get('updated_at'),
+        }
+
+    def remove(self, animation_id: str):
+        """Drop an animation from the index"""
+        for term in self.doc_terms.pop(animation_id, {}):
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(animation_id, None)
+            if not docs:
+                del self.postings[term]
+                self._drop_term(term)
+        self.summaries.pop(animation_id, None)
+
+    def _expand(self, token: str, prefix: bool, fuzzy: bool) -> Dict[str, float]:
+        """Map a query token to matching index terms with their match weight"""
+        matches = {}
+        if token in self.postings:
+            matches[token] = SEARCH_MATCH_WEIGHTS['exact']
+        if prefix:
+            start = bisect.bisect_left(self.vocabulary, token)
+            for term in self.vocabulary[start:start + SEARCH_MAX_EXPANSIONS]:
+                if not term.startswith(token):
+                    break
+                matches.setdefault(term, SEARCH_MATCH_WEIGHTS['prefix'])
+        if fuzzy and len(token) > 2:
+            candidates = set()
+            for variant in [token] + deletion_variants(token):
+                candidates.update(self.deletions.get(variant, ()))
+            for term in sorted(candidates)[:SEARCH_MAX_EXPANSIONS]:
+                matches.setdefault(term, SEARCH_MATCH_WEIGHTS['fuzzy'])
+        return matches
+
+    def search(self, query: str, prefix: bool = True, fuzzy: bool = True):
+        """Return (animation_id, score) pairs matching every query token, best first"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        for token in tokens:
+            token_scores: Dict[str, float] = {}
+            for term, match_weight in self._expand(token, prefix, fuzzy).items():
+                for animation_id, field_weight in self.postings[term].items():
+                    score = match_weight * field_weight
+                    if score > token_scores.get(animation_id, 0.0):
+                        token_scores[animation_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    animation_id: score + token_scores[animation_id]
+                    for animation_id, score in scores.items()
+                    if animation_id in token_scores
+                }
+            if not scores:
+                return []
+
+        return sorted(
+            scores.items(),
+            key=lambda item: (-item[1], self.summaries[item[0]]['name'].lower(), item[0])
+        )
+
+search_index = SearchIndex()
+
+SEARCH_PROJECTION = {"_id": 0, "id": 1, "name": 1, "animationData": 1,
+                     "thumbnail": 1, "isProject": 1, "updated_at": 1}
+# The indexed fields apart from animationData, for callers that already hold the animation
+SEARCH_SUMMARY_PROJECTION = {key: value for key, value in SEARCH_PROJECTION.items() if key != 'animationData'}
+
+async def rebuild_search_index():
+    """Load every animation into the search index"""
+    search_index.clear()
+    async for animation in db.animations.find({}, SEARCH_PROJECTION):
+        search_index.add(parse_from_mongo(animation))
+    logging.info(f"Search index built with {len(search_index)} animations")
+
+# Cross-worker cache invalidation
+CACHE_INVALIDATION_MODE = os.environ.get('CACHE_INVALIDATION_MODE', 'auto')  # auto, change_stream, poll, off
+CACHE_POLL_SECONDS = float(os.environ.get('CACHE_POLL_SECONDS', '2.0'))
+# updated_at is stamped before the write commits, so writes can land out of order; re-scan this far back
+CACHE_POLL_OVERLAP_SECONDS = float(os.environ.get('CACHE_POLL_OVERLAP_SECONDS', '30.0'))
+WARMUP_RETRY_INITIAL_SECONDS = 1.0
+WARMUP_RETRY_MAX_SECONDS = 30.0
+SEARCH_WARMUP_WAIT_SECONDS = float(os.environ.get('SEARCH_WARMUP_WAIT_SECONDS', '10.0'))
+# Change events carry only what the listeners index, not originalData or settings
+CHANGE_STREAM_PIPELINE = [{"$project": {
+    "operationType": 1, "documentKey": 1, "fullDocument._id": 1,
+    **{f"fullDocument.{field}": 1 for field, included in SEARCH_PROJECTION.items() if included},
+}}]
+CHANGE_STREAM_HISTORY_LOST = (280, 286)  # ChangeStreamFatalError, ChangeStreamHistoryLost
+
+class InvalidationBus:
+    """Propagates animation writes made by any worker to this worker's in-memory caches.
+
+    Listeners implement add(document) and remove(animation_id), like SearchIndex. Mongo
+    change streams are used when the deployment supports them (replica sets); otherwise
+    the collection is polled for documents whose updated_at falls in a window overlapping
+    the previous poll (see CACHE_POLL_OVERLAP_SECONDS), and the id set is diffed to pick
+    up deletes. Applying a change twice is harmless, so the worker that
+    made a write may also see it echoed back.
+
+    The stream starts at the operation time recorded by prime(), before the listeners
+    load their data, and reopens from the last resume token, so no write falls into a gap.
+    """
+
+    def __init__(self, mode: str = CACHE_INVALIDATION_MODE, poll_seconds: float = CACHE_POLL_SECONDS):
+        self.mode = mode
+        self.poll_seconds = poll_seconds
+        self.listeners = []
+        self.task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self):
+        """Forget everything prime() and earlier changes recorded"""
+        self.object_ids: Dict[Any, str] = {}  # Mongo _id -> animation id, for change-stream deletes
+        self.versions: Dict[str, Any] = {}  # animation id -> last updated_at applied, for polling
+        self.last_updated_at: Optional[str] = None
+        self.start_at_operation_time = None
+        self.resume_token = None
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def publish_upsert(self, document: Dict[str, Any]):
+        if not document or not document.get('id'):
+            return
+        if '_id' in document:
+            self.object_ids[document['_id']] = document['id']
+        self.track_version(document)
+        parsed = parse_from_mongo(document)
+        for listener in self.listeners:
+            listener.add(parsed)
+
+    def track_version(self, document: Dict[str, Any]):
+        updated_at = document.get('updated_at')
+        self.versions[document['id']] = updated_at
+        if isinstance(updated_at, str) and (self.last_updated_at is None or updated_at > self.last_updated_at):
+            self.last_updated_at = updated_at
+
+    def publish_delete(self, animation_id: str):
+        self.versions.pop(animation_id, None)
+        for listener in self.listeners:
+            listener.remove(animation_id)
+
+    async def prime(self):
+        """Record the current ids, newest updated_at and operation time; call before the listeners load their data"""
+        if self.mode in ('auto', 'poll'):
+            try:
+                # Polls query updated_at ranges; without an index every poll scans the collection
+                await timed_mongo("animations.create_index", db.animations.create_index("updated_at"))
+            except PyMongoError as e:
+                logging.warning(f"Could not create updated_at index: {e}")
+        if self.mode in ('auto', 'change_stream'):
+            try:
+                # operationTime is only reported by replica sets, which are also the only deployments with change streams
+                result = await timed_mongo("command.ping", db.command("ping"))
+                self.start_at_operation_time = result.get('operationTime')
+            except PyMongoError as e:
+                logging.warning(f"Could not read MongoDB operation time: {e}")
+        async for document in db.animations.find({}, {"_id": 1, "id": 1, "updated_at": 1}):
+            if document.get('id'):
+                self.object_ids[document['_id']] = document['id']
+                self.track_version(document)
+
+    def start(self):
+        if self.mode == 'off' or self.task is not None:
+            return
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def run(self):
+        if self.mode in ('auto', 'change_stream'):
+            while True:
+                try:
+                    await self.watch()
+                except OperationFailure as e:
+                    if e.code in CHANGE_STREAM_HISTORY_LOST:
+                        logging.warning(f"Change stream history lost, resynchronising: {e}")
+                        await self.resync()
+                        continue
+                    if self.mode == 'change_stream':
+                        logging.error(f"Change stream failed: {e}")
+                        await asyncio.sleep(self.poll_seconds)
+                        continue
+                    logging.info(f"Change streams unavailable ({e}), polling every {self.poll_seconds}s")
+                    break
+                except PyMongoError as e:
+                    logging.warning(f"Change stream interrupted, reopening: {e}")
+                    await asyncio.sleep(self.poll_seconds)
+        await self.poll()
+
+    async def watch(self):
+        options = {"full_document": 'updateLookup'}
+        if self.resume_token is not None:
+            options["resume_after"] = self.resume_token
+        elif self.start_at_operation_time is not None:
+            options["start_at_operation_time"] = self.start_at_operation_time
+        async with db.animations.watch(CHANGE_STREAM_PIPELINE, **options) as stream:
+            logging.info("Cache invalidation listening on MongoDB change stream")
+            async for change in stream:
+                operation = change.get('operationType')
+                if operation in ('insert', 'update', 'replace'):
+                    self.publish_upsert(change.get('fullDocument'))
+                elif operation == 'delete':
+                    animation_id = self.object_ids.pop(change['documentKey']['_id'], None)
+                    if animation_id:
+                        self.publish_delete(animation_id)
+                self.resume_token = change['_id']
+
+    async def resync(self):
+        """Re-read the whole collection after the stream can no longer be resumed"""
+        self.resume_token = None
+        self.start_at_operation_time = None
+        result = await timed_mongo("command.ping", db.command("ping"))
+        self.start_at_operation_time = result.get('operationTime')
+        self.last_updated_at = None
+        self.versions.clear()
+        await self.poll_once()
+
+    async def poll(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll_once()
+            except PyMongoError as e:
+                logging.warning(f"Cache invalidation poll failed: {e}")
+
+    def poll_since(self) -> Optional[str]:
+        """Lower bound for the next poll: the newest updated_at seen, minus the overlap window"""
+        if not self.last_updated_at:
+            return None
+        try:
+            since = datetime.fromisoformat(self.last_updated_at) - timedelta(seconds=CACHE_POLL_OVERLAP_SECONDS)
+        except ValueError:
+            return None
+        return since.isoformat()
+
+    async def poll_once(self):
+        since = self.poll_since()
+        query = {"updated_at": {"$gte": since}} if since else {}
+        # Fetch versions first and full documents only for writes not yet applied
+        changed = []
+        async for document in db.animations.find(query, {"_id": 1, "id": 1, "updated_at": 1}):
+            if document.get('id') and self.versions.get(document['id']) != document.get('updated_at'):
+                changed.append(document['id'])
+        if changed:
+            async for document in db.animations.find({"id": {"$in": changed}}, {**SEARCH_PROJECTION, "_id": 1}):
+                self.publish_upsert(document)
+
+        # Every live document has been seen by now, so a count mismatch means something was deleted
+        count = await timed_mongo("animations.estimated_document_count", db.animations.estimated_document_count())
+        if count == len(self.object_ids):
+            return
+        current_ids = set(await timed_mongo("animations.distinct", db.animations.distinct("id")))
+        for object_id, animation_id in list(self.object_ids.items()):
+            if animation_id not in current_ids:
+                del self.object_ids[object_id]
+                self.publish_delete(animation_id)
+
+invalidation_bus = InvalidationBus()
+invalidation_bus.subscribe(search_index)
+
+# dotLottie export
+DOTLOTTIE_CHUNK_BYTES = 256 * 1024
+EXPORT_CACHE_BYTES = int(os.environ.get('EXPORT_CACHE_BYTES', str(64 * 1024 * 1024)))
+EXPORT_VERSION_ENTRIES = 4096  # (animation id, updated_at) -> content hash pairs remembered
+DATA_URI_PATTERN = re.compile(r"^data:image/([\w.+-]+);base64,(.*)$", re.DOTALL)
+IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg", "jpg": "jpg", "webp": "webp", "gif": "gif", "svg+xml": "svg"}
+DEFLATED_IMAGE_EXTENSIONS = {"svg"}  # Text formats; the others are already compressed
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)  # Fixed entry timestamps keep archives byte-for-byte reproducible
+
+def extract_image_assets(animation_data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[str, bytes]]]:
+    """Move embedded base64 images out of the assets list into separate files.
+
+    Returns a copy of the animation whose image assets point at /images/<file> (only the
+    assets list is copied) and the (filename, bytes) pairs to store alongside it. Filenames
+    are generated (image_<n>.<ext>) rather than taken from the user-controlled asset id, so
+    they can never form a path outside images/. Unknown image types stay embedded.
+    """
+    assets = animation_data.get('assets')
+    if not isinstance(assets, list):
+        return animation_data, []
+
+    images = []
+    rewritten_assets = []
+    for asset in assets:
+        source = asset.get('p') if isinstance(asset, dict) else None
+        match = DATA_URI_PATTERN.match(source) if isinstance(source, str) else None
+        if not match:
+            rewritten_assets.append(asset)
+            continue
+        subtype, payload = match.groups()
+        extension = IMAGE_EXTENSIONS.get(subtype.lower())
+        if extension is None:
+            rewritten_assets.append(asset)
+            continue
+        try:
+            content = base64.b64decode(payload, validate=False)
+        except ValueError:
+            rewritten_assets.append(asset)
+            continue
+        filename = f"image_{len(images)}.{extension}"
+        images.append((filename, content))
+        rewritten_assets.append({**asset, "u": "/images/", "p": filename, "e": 0})
+
+    if not images:
+        return animation_data, []
+    return {**animation_data, "assets": rewritten_assets}, images
+
+def build_dotlottie_manifest(animation_id: str) -> Dict[str, Any]:
+    return {
+        "version": "1.0",
+        "generator": "MotionEdit",
+        "revision": 1,
+        "activeAnimationId": animation_id,
+        "animations": [{"id": animation_id, "speed": 1, "loop": True, "direction": 1, "playMode": "normal"}],
+    }
+
+class ZipStreamBuffer:
+    """Write-only, non-seekable file object; zipfile then emits data descriptors so it can stream"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+class ExportCache:
+    """LRU of finished archives keyed by content hash, bounded by total bytes.
+
+    Keys are derived from the archive contents, so entries never go stale and need no
+    cross-worker invalidation; each worker simply fills its own cache. put() runs in the
+    threadpool that drives streaming responses while get() runs on the event loop, so
+    both take a lock.
+
+    Hashing requires building the archive contents, so the hash of each stored version
+    (animation id, updated_at) is remembered too; repeat downloads of an unchanged
+    animation then skip the build entirely.
+    """
+
+    def __init__(self, max_bytes: int = EXPORT_CACHE_BYTES, max_versions: int = EXPORT_VERSION_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_versions = max_versions
+        self.entries: OrderedDict = OrderedDict()
+        self.versions: OrderedDict = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def hash_for(self, version: Tuple[str, Any]) -> Optional[str]:
+        with self.lock:
+            content_hash = self.versions.get(version)
+            if content_hash is not None:
+                self.versions.move_to_end(version)
+            return content_hash
+
+    def remember(self, version: Tuple[str, Any], content_hash: str):
+        with self.lock:
+            self.versions[version] = content_hash
+            self.versions.move_to_end(version)
+            while len(self.versions) > self.max_versions:
+                self.versions.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+export_cache = ExportCache()
+
+class DotLottieExport:
+    """A dotLottie archive (manifest, animation JSON, image files) ready to be streamed"""
+
+    def __init__(self, animation_id: str, animation_data: Dict[str, Any]):
+        self.animation_id = animation_id
+        rewritten, self.images = extract_image_assets(animation_data)
+        with JSON_LATENCY.time(operation="dotlottie_encode"):
+            self.animation_json = json.dumps(rewritten, separators=(',', ':')).encode()
+        self.manifest_json = json.dumps(build_dotlottie_manifest(animation_id), indent=2).encode()
+
+        digest = hashlib.sha256(self.manifest_json)
+        digest.update(self.animation_json)
+        for filename, content in self.images:
+            digest.update(filename.encode())
+            digest.update(content)
+        self.content_hash = digest.hexdigest()
+
+    def entry(self, name: str, compress_type: int) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+        info.compress_type = compress_type
+        return info
+
+    def iter_archive(self) -> Iterator[bytes]:
+        """Yield the zip archive in chunks while it is being compressed"""
+        buffer = ZipStreamBuffer()
+        with zipfile.ZipFile(buffer, mode='w') as archive:
+            archive.writestr(self.entry("manifest.json", zipfile.ZIP_DEFLATED), self.manifest_json)
+            yield buffer.drain()
+
+            with archive.open(self.entry(f"animations/{self.animation_id}.json", zipfile.ZIP_DEFLATED), 'w') as entry:
+                for start in range(0, len(self.animation_json), DOTLOTTIE_CHUNK_BYTES):
+                    entry.write(self.animation_json[start:start + DOTLOTTIE_CHUNK_BYTES])
+                    if buffer.chunks:
+                        yield buffer.drain()
+            yield buffer.drain()
+
+            # Raster images are already compressed; deflating them again only costs CPU
+            for filename, content in self.images:
+                extension = filename.rsplit('.', 1)[-1]
+                compress_type = zipfile.ZIP_DEFLATED if extension in DEFLATED_IMAGE_EXTENSIONS else zipfile.ZIP_STORED
+                archive.writestr(self.entry(f"images/{filename}", compress_type), content)
+                yield buffer.drain()
+        yield buffer.drain()
+
+def stream_and_cache(export: DotLottieExport) -> Iterator[bytes]:
+    """Stream a freshly built archive, keeping a copy for the cache once it completes.
+
+    Archives larger than the whole cache are never kept, so buffering stops as soon as
+    the running size passes that limit.
+    """
+    parts: Optional[List[bytes]] = []
+    size = 0
+    for chunk in export.iter_archive():
+        if not chunk:
+            continue
+        if parts is not None:
+            size += len(chunk)
+            if size > export_cache.max_bytes:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        export_cache.put(export.content_hash, b"".join(parts))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate If-None-Match against an ETag: a list of tags or "*", compared weakly (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+async def export_dotlottie(animation_id: str, if_none_match: Optional[str] = None) -> Response:
+    """Build a .lottie archive from the stored animation, served from cache when unchanged.
+
+    if_none_match is only honoured for GET downloads; conditional POSTs would need 412 semantics.
+    """
+    stored = await timed_mongo("animations.find_one", db.animations.find_one(
+        {"id": animation_id}, {"_id": 0, "updated_at": 1}))
+    if not stored:
+        raise HTTPException(status_code=404, detail="Animation not found")
+
+    headers = {"Content-Disposition": f'attachment; filename="animation_{animation_id}.lottie"'}
+    # Every write stamps updated_at, so a known version needs neither animationData nor a build
+    content_hash = export_cache.hash_for((animation_id, stored['updated_at'])) if stored.get('updated_at') else None
+    if content_hash is not None:
+        headers["ETag"] = f'"{content_hash}"'
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        cached = export_cache.get(content_hash)
+        if cached is not None:
+            EXPORT_CACHE_LOOKUPS.inc(result="hit")
+            return Response(content=cached, media_type="application/zip", headers=headers)
+
+    animation = await timed_mongo("animations.find_one", db.animations.find_one(
+        {"id": animation_id}, {"_id": 0, "animationData": 1, "updated_at": 1}))
+    if not animation:
+        raise HTTPException(status_code=404, detail="Animation not found")
+    export = await run_in_threadpool(DotLottieExport, animation_id, animation.get('animationData') or {})
+    if animation.get('updated_at'):
+        export_cache.remember((animation_id, animation['updated_at']), export.content_hash)
+    headers["ETag"] = f'"{export.content_hash}"'
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    # The archive may be cached under another version with identical content, e.g. after a no-op edit
+    cached = export_cache.get(export.content_hash)
+    EXPORT_CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+    if cached is not None:
+        return Response(content=cached, media_type="application/zip", headers=headers)
+    return StreamingResponse(stream_and_cache(export), media_type="application/zip", headers=headers)
+
+def load_llm_client():
+    """Import the LLM SDK on first use so workers that never serve an AI edit skip its import cost"""
+    global LlmChat, UserMessage
+    if LlmChat is None:
+        from emergentintegrations.llm.chat import LlmChat as chat_class, UserMessage as message_class
+        LlmChat, UserMessage = chat_class, message_class
+
 async def process_ai_edit(animation_data: Dict[str, Any], prompt: str) -> Dict[str, Any]:
     """Process AI editing request using Google's Gemini model"""
     try:
@@ -126,6 +1023,7 @@ async def process_ai_edit(animation_data: Dict[str, Any], prompt: str) -> Dict[s
             raise HTTPException(status_code=500, detail="No API key available")
         
         logging.info(f"Processing AI edit with prompt: {prompt}")
+        load_llm_client()
         
         # Use Google's API key directly (this is more reliable for Lottie editing)
         chat = LlmChat(
@@ -155,12 +1053,15 @@ EXAMPLES OF EXACT CHANGES:
 You MUST make the change exactly as requested. Return ONLY valid JSON."""
         ).with_model("gemini", "gemini-2.0-flash")
 
+        with JSON_LATENCY.time(operation="ai_prompt_encode"):
+            animation_json = json.dumps(animation_data, indent=1)
+
         # Create user message with animation data and prompt
         user_message = UserMessage(
             text=f"""TASK: {prompt}
 
 CURRENT LOTTIE JSON:
-{json.dumps(animation_data, indent=1)}
+{animation_json}
 
 INSTRUCTIONS:
 1. Find the exact element mentioned in the task
@@ -175,9 +1076,11 @@ Return ONLY the modified JSON:"""
         # Send message and get response with timeout
         logging.info("Sending request to AI model...")
         try:
-            response = await asyncio.wait_for(chat.send_message(user_message), timeout=30.0)
+            with LLM_LATENCY.time(model="gemini-2.0-flash"):
+                response = await asyncio.wait_for(chat.send_message(user_message), timeout=30.0)
         except asyncio.TimeoutError:
             logging.error("AI request timed out after 30 seconds")
+            AI_EDIT_OUTCOMES.inc(outcome="timeout")
             return make_simple_modifications(animation_data, prompt)
         
         logging.info(f"AI response received: {response[:200]}...")
@@ -200,28 +1103,34 @@ Return ONLY the modified JSON:"""
             response_text = response_text.strip()
             
             # Parse JSON
-            modified_data = json.loads(response_text)
+            with JSON_LATENCY.time(operation="ai_response_decode"):
+                modified_data = json.loads(response_text)
             
             # Validate that it's still a Lottie animation
             if not isinstance(modified_data, dict) or 'v' not in modified_data:
                 logging.warning("AI response doesn't look like valid Lottie JSON, returning original")
+                AI_EDIT_OUTCOMES.inc(outcome="not_lottie")
                 return animation_data
             
             logging.info("AI edit successful, returning modified animation")
+            AI_EDIT_OUTCOMES.inc(outcome="success")
             return modified_data
             
         except json.JSONDecodeError as e:
             logging.error(f"Failed to parse AI response as JSON: {e}")
             logging.error(f"Response was: {response}")
+            AI_EDIT_OUTCOMES.inc(outcome="invalid_json")
             
             # Try to make simple modifications based on the prompt if AI fails
             return make_simple_modifications(animation_data, prompt)
             
     except Exception as e:
         logging.error(f"AI editing error: {e}")
+        AI_EDIT_OUTCOMES.inc(outcome="error")
         # Try simple modifications as fallback
         return make_simple_modifications(animation_data, prompt)
 
+@FALLBACK_LATENCY.time()
 def make_simple_modifications(animation_data: Dict[str, Any], prompt: str) -> Dict[str, Any]:
     """Make simple modifications when AI fails"""
     try:
@@ -325,6 +1234,9 @@ def make_simple_modifications(animation_data: Dict[str, Any], prompt: str) -> Di
         logging.error(f"Simple modifications failed: {e}")
         return animation_data
 
+# Create a router with the /api prefix
+api_router = APIRouter(prefix="/api", route_class=TimedRoute)
+
 # API Routes
 @api_router.get("/")
 async def root():
@@ -334,12 +1246,34 @@ async def root():
 async def get_animations():
     """Get all animations"""
     try:
-        animations = await db.animations.find().to_list(length=None)
+        animations = await timed_mongo("animations.find", db.animations.find().to_list(length=None))
         return [Animation(**parse_from_mongo(anim)) for anim in animations]
     except Exception as e:
         logging.error(f"Error fetching animations: {e}")
         return []
 
+@api_router.get("/animations/search", response_model=AnimationSearchResponse)
+async def search_animations(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    prefix: bool = True,
+    fuzzy: bool = True,
+):
+    """Search animation names and text-layer contents"""
+    if cache_warmup is not None and not cache_warmup.done():
+        # The index is loaded in the background after startup; wait for it rather than return partial results
+        try:
+            await asyncio.wait_for(asyncio.shield(cache_warmup), timeout=SEARCH_WARMUP_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Search index is still loading")
+    matches = search_index.search(q, prefix=prefix, fuzzy=fuzzy)
+    results = [
+        AnimationSummary(**search_index.summaries[animation_id], score=score)
+        for animation_id, score in matches[offset:offset + limit]
+    ]
+    return AnimationSearchResponse(query=q, total=len(matches), offset=offset, limit=limit, results=results)
+
 @api_router.post("/animations", response_model=Animation)
 async def create_animation(animation: AnimationCreate):
     """Create a new animation template"""
@@ -351,7 +1285,8 @@ async def create_animation(animation: AnimationCreate):
         )
         animation_dict = prepare_for_mongo(new_animation.dict())
         
-        await db.animations.insert_one(animation_dict)
+        await timed_mongo("animations.insert_one", db.animations.insert_one(animation_dict))
+        search_index.add(new_animation.dict())
         return new_animation
     except Exception as e:
         logging.error(f"Error creating animation: {e}")
@@ -361,7 +1296,7 @@ async def create_animation(animation: AnimationCreate):
 async def get_projects():
     """Get all user projects"""
     try:
-        projects = await db.projects.find().to_list(length=None)
+        projects = await timed_mongo("projects.find", db.projects.find().to_list(length=None))
         return [Project(**parse_from_mongo(proj)) for proj in projects]
     except Exception as e:
         logging.error(f"Error fetching projects: {e}")
@@ -374,7 +1309,7 @@ async def create_project(project: ProjectCreate):
         new_project = Project(**project.dict())
         project_dict = prepare_for_mongo(new_project.dict())
         
-        await db.projects.insert_one(project_dict)
+        await timed_mongo("projects.insert_one", db.projects.insert_one(project_dict))
         return new_project
     except Exception as e:
         logging.error(f"Error creating project: {e}")
@@ -385,7 +1320,7 @@ async def update_project(project_id: str, update_data: dict):
     """Update a project"""
     try:
         # Get existing project
-        existing = await db.projects.find_one({"id": project_id})
+        existing = await timed_mongo("projects.find_one", db.projects.find_one({"id": project_id}))
         if not existing:
             raise HTTPException(status_code=404, detail="Project not found")
         
@@ -394,13 +1329,13 @@ async def update_project(project_id: str, update_data: dict):
         update_dict = prepare_for_mongo(update_data)
         
         # Update in database
-        await db.projects.update_one(
+        await timed_mongo("projects.update_one", db.projects.update_one(
             {"id": project_id},
             {"$set": update_dict}
-        )
+        ))
         
         # Return updated project
-        updated = await db.projects.find_one({"id": project_id})
+        updated = await timed_mongo("projects.find_one", db.projects.find_one({"id": project_id}))
         return Project(**parse_from_mongo(updated))
     except HTTPException:
         raise
@@ -412,10 +1347,19 @@ async def update_project(project_id: str, update_data: dict):
 async def export_animation(request: ExportRequest):
     """Export animation in specified format"""
     try:
-        if request.format == 'json':
+        if request.format == 'lottie':
+            return await export_dotlottie(request.animationId)
+        elif request.format == 'json':
+            animation_data = request.animationData
+            if animation_data is None:
+                animation = await timed_mongo("animations.find_one", db.animations.find_one(
+                    {"id": request.animationId}, {"_id": 0, "animationData": 1}))
+                if not animation:
+                    raise HTTPException(status_code=404, detail="Animation not found")
+                animation_data = animation.get('animationData')
             return {
                 "success": True,
-                "data": request.animationData,
+                "data": animation_data,
                 "filename": f"animation_{request.animationId}.json",
                 "contentType": "application/json"
             }
@@ -428,6 +1372,19 @@ async def export_animation(request: ExportRequest):
             }
         else:
             raise HTTPException(status_code=400, detail="Unsupported export format")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Export error: {e}")
+        raise HTTPException(status_code=500, detail="Export failed")
+
+@api_router.get("/animations/{animation_id}/export.lottie")
+async def download_dotlottie(animation_id: str, request: Request):
+    """Download an animation as a dotLottie archive; supports If-None-Match revalidation"""
+    try:
+        return await export_dotlottie(animation_id, request.headers.get("if-none-match"))
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Export error: {e}")
         raise HTTPException(status_code=500, detail="Export failed")
@@ -436,7 +1393,7 @@ async def export_animation(request: ExportRequest):
 async def get_animation(animation_id: str):
     """Get a specific animation"""
     try:
-        animation = await db.animations.find_one({"id": animation_id})
+        animation = await timed_mongo("animations.find_one", db.animations.find_one({"id": animation_id}))
         if not animation:
             raise HTTPException(status_code=404, detail="Animation not found")
         return Animation(**parse_from_mongo(animation))
@@ -451,7 +1408,7 @@ async def update_animation(animation_id: str, update_data: AnimationUpdate):
     """Update an animation"""
     try:
         # Get existing animation
-        existing = await db.animations.find_one({"id": animation_id})
+        existing = await timed_mongo("animations.find_one", db.animations.find_one({"id": animation_id}))
         if not existing:
             raise HTTPException(status_code=404, detail="Animation not found")
         
@@ -461,14 +1418,16 @@ async def update_animation(animation_id: str, update_data: AnimationUpdate):
         update_dict = prepare_for_mongo(update_dict)
         
         # Update in database
-        await db.animations.update_one(
+        await timed_mongo("animations.update_one", db.animations.update_one(
             {"id": animation_id},
             {"$set": update_dict}
-        )
+        ))
         
         # Return updated animation
-        updated = await db.animations.find_one({"id": animation_id})
-        return Animation(**parse_from_mongo(updated))
+        updated = await timed_mongo("animations.find_one", db.animations.find_one({"id": animation_id}))
+        updated_animation = Animation(**parse_from_mongo(updated))
+        search_index.add(updated_animation.dict())
+        return updated_animation
     except HTTPException:
         raise
     except Exception as e:
@@ -479,9 +1438,10 @@ async def update_animation(animation_id: str, update_data: AnimationUpdate):
 async def delete_animation(animation_id: str):
     """Delete an animation"""
     try:
-        result = await db.animations.delete_one({"id": animation_id})
+        result = await timed_mongo("animations.delete_one", db.animations.delete_one({"id": animation_id}))
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Animation not found")
+        search_index.remove(animation_id)
         return {"message": "Animation deleted successfully"}
     except HTTPException:
         raise
@@ -499,13 +1459,17 @@ async def edit_animation_with_ai(request: AIEditRequest):
         # Update the animation in database if needed
         if request.animationId:
             try:
-                await db.animations.update_one(
+                await timed_mongo("animations.update_one", db.animations.update_one(
                     {"id": request.animationId},
                     {"$set": {
                         "animationData": modified_data,
                         "updated_at": datetime.now(timezone.utc).isoformat()
                     }}
-                )
+                ))
+                edited = await timed_mongo("animations.find_one", db.animations.find_one(
+                    {"id": request.animationId}, SEARCH_SUMMARY_PROJECTION))
+                if edited:
+                    search_index.add({**parse_from_mongo(edited), "animationData": modified_data})
             except Exception as e:
                 logging.warning(f"Failed to update animation in database: {e}")
         
@@ -522,16 +1486,131 @@ async def edit_animation_with_ai(request: AIEditRequest):
             message=f"Failed to edit animation: {str(e)}"
         )
 
-# Include the router in the main app
-app.include_router(api_router)
+class RequestMetricsMiddleware:
+    """Record per-route latency and log slow requests with their payload sizes.
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    A plain ASGI middleware that wraps send, so streamed responses are timed until their
+    last body chunk has been sent and their size is counted as it goes. Background tasks
+    that run after the response are not included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        response_bytes = 0
+        finished = False
+
+        def observe():
+            nonlocal finished
+            finished = True
+            duration = time.perf_counter() - start
+            method = scope["method"]
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_LATENCY.observe(duration, method=method, route=route, status=status)
+            if duration >= SLOW_REQUEST_SECONDS:
+                SLOW_REQUESTS.inc(method=method, route=route)
+                headers = dict(scope.get("headers") or [])
+                logging.warning(
+                    f"Slow request: {method} {route} took {duration:.3f}s "
+                    f"(status={status}, request_bytes={headers.get(b'content-length', b'0').decode()}, "
+                    f"response_bytes={response_bytes})"
+                )
+
+        async def timed_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            # Errors and client disconnects end the request without a final body chunk
+            if not finished:
+                observe()
+
+async def metrics():
+    """Expose metrics in Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+async def warm_caches():
+    """Load the search index and start cross-worker invalidation without delaying readiness.
+
+    prime() records versions for every document, so the bus must not start on top of a
+    partially loaded index: it would consider those documents current and never reload
+    them. Failures therefore reset the bus and retry with backoff.
+    """
+    delay = WARMUP_RETRY_INITIAL_SECONDS
+    while True:
+        try:
+            await invalidation_bus.prime()
+            await rebuild_search_index()
+            break
+        except Exception as e:
+            invalidation_bus.reset()
+            search_index.clear()
+            logging.error(f"Failed to build search index, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, WARMUP_RETRY_MAX_SECONDS)
+    invalidation_bus.start()
+
+def create_app(database=None) -> FastAPI:
+    """Build the application.
+
+    The Mongo client is opened in the lifespan rather than at import, so importing this
+    module is cheap. Pass database to use an existing database object (e.g. a test double)
+    instead of connecting with MONGO_URL/DB_NAME.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        global client, db, cache_warmup
+        owns_client = database is None
+        if owns_client:
+            client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+            db = client[os.environ['DB_NAME']]
+        else:
+            db = database
+        cache_warmup = asyncio.create_task(warm_caches())
+        metrics_flush = asyncio.create_task(flush_metrics()) if METRICS_MULTIPROC_DIR else None
+        try:
+            yield
+        finally:
+            cache_warmup.cancel()
+            try:
+                await cache_warmup
+            except asyncio.CancelledError:
+                pass
+            if metrics_flush is not None:
+                metrics_flush.cancel()
+                write_metrics_snapshot()
+            await invalidation_bus.stop()
+            if owns_client:
+                client.close()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(api_router)
+    app.add_api_route("/metrics", metrics, include_in_schema=False)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_credentials=True,
+        allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(RequestMetricsMiddleware)
+    return app
 
 # Configure logging
 logging.basicConfig(
@@ -540,10 +1619,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+app = create_app()
 
 if __name__ == "__main__":
+    import tempfile
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
+    # Each worker is a separate process with its own caches, kept coherent by invalidation_bus,
+    # and its own metrics, summed through METRICS_MULTIPROC_DIR (inherited by the workers).
+    if worker_count() > 1 and not METRICS_MULTIPROC_DIR:
+        os.environ['METRICS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix="motionedit-metrics-")
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=8001,
+        workers=worker_count(),
+        app_dir=str(ROOT_DIR),
+    )
\ No newline at end of file
@@ -0,0 +1,64 @@
+import asyncio
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+import server
+from benchmarks.fakes import FakeDatabase
+
+BACKEND_DIR = Path(server.__file__).resolve().parent
+
+
+def test_lifespan_starts_warm_up_and_cancels_it_on_shutdown(monkeypatch):
+    database = FakeDatabase()
+    events = []
+
+    async def slow_warm_up():
+        events.append("started")
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+    monkeypatch.setattr(server, "warm_caches", slow_warm_up)
+
+    with TestClient(server.create_app(database=database)) as client:
+        assert server.db is database
+        assert client.get("/api/animations").json() == []
+        warm_up = server.cache_warmup
+        assert not warm_up.done()
+
+    assert events == ["started", "cancelled"]
+    assert warm_up.cancelled()
+
+
+def test_import_defers_llm_sdk_until_first_use():
+    # A fresh interpreter, since this test session has already imported server
+    probe = "import sys, server; print('emergentintegrations' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, env={**os.environ, "CACHE_INVALIDATION_MODE": "off"},
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_load_llm_client_imports_sdk_once(monkeypatch):
+    chat_module = types.ModuleType("emergentintegrations.llm.chat")
+    chat_module.LlmChat = type("LlmChat", (), {})
+    chat_module.UserMessage = type("UserMessage", (), {})
+    monkeypatch.setitem(sys.modules, "emergentintegrations", types.ModuleType("emergentintegrations"))
+    monkeypatch.setitem(sys.modules, "emergentintegrations.llm", types.ModuleType("emergentintegrations.llm"))
+    monkeypatch.setitem(sys.modules, "emergentintegrations.llm.chat", chat_module)
+    monkeypatch.setattr(server, "LlmChat", None)
+    monkeypatch.setattr(server, "UserMessage", None)
+
+    server.load_llm_client()
+    assert server.LlmChat is chat_module.LlmChat
+    assert server.UserMessage is chat_module.UserMessage
+
+    # Later calls keep the classes already loaded
+    monkeypatch.delitem(sys.modules, "emergentintegrations.llm.chat")
+    server.load_llm_client()
+    assert server.LlmChat is chat_module.LlmChat
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import io
+import json
+import zipfile
+
+import server
+from benchmarks.fakes import FakeDatabase
+from server import DotLottieExport, ExportCache, etag_matches, export_dotlottie, extract_image_assets
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def image_asset(asset_id, mime="png", content=PNG_BYTES):
+    return {"id": asset_id, "w": 8, "h": 8, "u": "", "e": 1,
+            "p": f"data:image/{mime};base64," + base64.b64encode(content).decode()}
+
+
+def sample_animation(*assets):
+    return {"v": "5.7.4", "fr": 30, "ip": 0, "op": 60, "w": 100, "h": 100,
+            "assets": list(assets), "layers": [{"ty": 4, "nm": "Shape", "ind": 1}]}
+
+
+def read_archive(export):
+    return zipfile.ZipFile(io.BytesIO(b"".join(export.iter_archive())))
+
+
+def test_archive_round_trips_manifest_animation_and_images():
+    original = sample_animation(image_asset("img_0"), {"id": "comp_0", "layers": []})
+    archive = read_archive(DotLottieExport("anim-1", original))
+
+    assert archive.testzip() is None
+    assert sorted(archive.namelist()) == ["animations/anim-1.json", "images/image_0.png", "manifest.json"]
+
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["activeAnimationId"] == "anim-1"
+    assert [entry["id"] for entry in manifest["animations"]] == ["anim-1"]
+
+    animation = json.loads(archive.read("animations/anim-1.json"))
+    assert animation["layers"] == original["layers"]
+    assert animation["assets"][0] == {**original["assets"][0], "u": "/images/", "p": "image_0.png", "e": 0}
+    assert animation["assets"][1] == original["assets"][1]
+    assert archive.read("images/image_0.png") == PNG_BYTES
+
+
+def test_json_and_svg_are_deflated_and_raster_images_are_stored():
+    svg = image_asset("img_1", mime="svg+xml", content=b"<svg xmlns='http://www.w3.org/2000/svg'/>")
+    archive = read_archive(DotLottieExport("a", sample_animation(image_asset("img_0"), svg)))
+
+    assert archive.getinfo("animations/a.json").compress_type == zipfile.ZIP_DEFLATED
+    assert archive.getinfo("images/image_0.png").compress_type == zipfile.ZIP_STORED
+    assert archive.getinfo("images/image_1.svg").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_archive_is_streamed_in_several_chunks():
+    large = sample_animation()
+    large["layers"] = [{"ty": 4, "nm": f"Shape {number}", "ind": number} for number in range(20000)]
+
+    chunks = [chunk for chunk in DotLottieExport("a", large).iter_archive() if chunk]
+
+    assert len(chunks) > 2
+
+
+def test_asset_ids_cannot_escape_images_directory():
+    archive = read_archive(DotLottieExport("a", sample_animation(image_asset("../../evil"))))
+
+    assert [name for name in archive.namelist() if name.startswith("images/")] == ["images/image_0.png"]
+    assert all(".." not in name for name in archive.namelist())
+
+
+def test_unknown_image_types_stay_embedded():
+    asset = image_asset("img_0", mime="x-unknown")
+    rewritten, images = extract_image_assets(sample_animation(asset))
+
+    assert images == []
+    assert rewritten["assets"][0] == asset
+
+
+def test_content_hash_tracks_content():
+    first = DotLottieExport("a", sample_animation(image_asset("img_0")))
+    same = DotLottieExport("a", sample_animation(image_asset("img_0")))
+    other_image = DotLottieExport("a", sample_animation(image_asset("img_0", content=b"other")))
+    other_id = DotLottieExport("b", sample_animation(image_asset("img_0")))
+
+    assert first.content_hash == same.content_hash
+    assert first.content_hash != other_image.content_hash
+    assert first.content_hash != other_id.content_hash
+
+
+def test_extraction_does_not_mutate_the_stored_document():
+    original = sample_animation(image_asset("img_0"))
+    snapshot = json.loads(json.dumps(original))
+
+    DotLottieExport("a", original)
+
+    assert original == snapshot
+
+
+def test_if_none_match_accepts_lists_weak_tags_and_wildcard():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"xyz", W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"abcd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert not etag_matches('', '"abc"')
+
+
+def test_unchanged_animation_is_served_without_rebuilding(monkeypatch):
+    database = FakeDatabase()
+    database.animations.documents.append(
+        {"id": "a", "animationData": sample_animation(), "updated_at": "2025-01-01T10:00:00+00:00"})
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "export_cache", ExportCache())
+    builds = []
+
+    def counting_export(*args):
+        builds.append(args)
+        return DotLottieExport(*args)
+    monkeypatch.setattr(server, "DotLottieExport", counting_export)
+
+    async def download(if_none_match=None):
+        response = await export_dotlottie("a", if_none_match)
+        if response.status_code == 200 and not hasattr(response, "body"):
+            response.body = b"".join([chunk async for chunk in response.body_iterator])
+        return response
+
+    first = asyncio.run(download())
+    etag = first.headers["ETag"]
+    assert asyncio.run(download()).body == first.body
+    assert asyncio.run(download(etag)).status_code == 304
+    assert len(builds) == 1
+
+    # A new updated_at means a new version, even when the content hash stays the same
+    database.animations.documents[0]["updated_at"] = "2025-01-01T10:00:01+00:00"
+    assert asyncio.run(download(etag)).status_code == 304
+    assert len(builds) == 2
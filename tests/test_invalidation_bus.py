@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+import server
+from benchmarks.fakes import FakeDatabase
+from server import CACHE_POLL_OVERLAP_SECONDS, CHANGE_STREAM_PIPELINE, InvalidationBus, SearchIndex
+
+
+class RecordingListener:
+    def __init__(self):
+        self.added = []
+        self.removed = []
+
+    def add(self, document):
+        self.added.append(document["id"])
+
+    def remove(self, animation_id):
+        self.removed.append(animation_id)
+
+
+class FakeChangeStream:
+    """Replays a fixed list of change events, then ends like a closed cursor"""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.changes:
+            raise StopAsyncIteration
+        return self.changes.pop(0)
+
+
+def document(object_id, animation_id, name, updated_at):
+    return {"_id": object_id, "id": animation_id, "name": name, "animationData": {"layers": []},
+            "isProject": False, "updated_at": updated_at}
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+def primed_bus(database, *documents, mode="poll"):
+    database.animations.documents.extend(documents)
+    bus = InvalidationBus(mode=mode)
+    listener = RecordingListener()
+    bus.subscribe(listener)
+    asyncio.run(bus.prime())
+    return bus, listener
+
+
+def test_poll_applies_upserts_from_another_worker(database):
+    bus, listener = primed_bus(database, document(1, "a", "Intro", "2025-01-01T10:00:00+00:00"))
+    index = SearchIndex()
+    bus.subscribe(index)
+
+    # Another worker edits "a" and inserts "b"
+    database.animations.documents[0].update(name="Outro", updated_at="2025-01-01T10:00:05+00:00")
+    database.animations.documents.append(document(2, "b", "Birthday", "2025-01-01T10:00:06+00:00"))
+    asyncio.run(bus.poll_once())
+
+    assert sorted(listener.added) == ["a", "b"]
+    assert [animation_id for animation_id, _ in index.search("outro")] == ["a"]
+    assert bus.versions == {"a": "2025-01-01T10:00:05+00:00", "b": "2025-01-01T10:00:06+00:00"}
+    assert database.animations.indexes == {"updated_at_1"}
+
+    # Nothing changed since, so the next poll publishes nothing
+    asyncio.run(bus.poll_once())
+    assert sorted(listener.added) == ["a", "b"]
+
+
+def test_poll_picks_up_out_of_order_write_inside_overlap_window(database):
+    bus, listener = primed_bus(database, document(1, "a", "Intro", "2025-01-01T10:00:00+00:00"))
+
+    # A write stamped before the newest updated_at seen (clock skew, slow commit)
+    assert CACHE_POLL_OVERLAP_SECONDS > 15
+    database.animations.documents.append(document(2, "b", "Late", "2025-01-01T09:59:45+00:00"))
+    asyncio.run(bus.poll_once())
+
+    assert listener.added == ["b"]
+    assert bus.last_updated_at == "2025-01-01T10:00:00+00:00"
+
+
+def test_poll_detects_deletes_from_count_and_distinct(database):
+    bus, listener = primed_bus(database,
+                               document(1, "a", "Intro", "2025-01-01T10:00:00+00:00"),
+                               document(2, "b", "Outro", "2025-01-01T10:00:01+00:00"))
+
+    asyncio.run(database.animations.delete_one({"id": "a"}))
+    asyncio.run(bus.poll_once())
+
+    assert listener.removed == ["a"]
+    assert listener.added == []
+    assert list(bus.object_ids.values()) == ["b"]
+    assert "a" not in bus.versions
+
+
+def test_watch_stores_resume_token_and_resumes_after_it(database):
+    bus, listener = primed_bus(database, document(1, "a", "Intro", "2025-01-01T10:00:00+00:00"),
+                               mode="change_stream")
+    bus.start_at_operation_time = "operation-time"
+    calls = []
+    pipelines = []
+    streams = [
+        [
+            {"_id": {"_data": "token-1"}, "operationType": "insert",
+             "fullDocument": document(2, "b", "Birthday", "2025-01-01T10:00:01+00:00")},
+            {"_id": {"_data": "token-2"}, "operationType": "delete", "documentKey": {"_id": 1}},
+        ],
+        [],
+    ]
+
+    def watch(pipeline=None, **options):
+        pipelines.append(pipeline)
+        calls.append(options)
+        return FakeChangeStream(streams.pop(0))
+    database.animations.watch = watch
+
+    asyncio.run(bus.watch())
+    assert listener.added == ["b"]
+    assert listener.removed == ["a"]
+    assert bus.resume_token == {"_data": "token-2"}
+    assert calls[0]["start_at_operation_time"] == "operation-time"
+    assert "resume_after" not in calls[0]
+    assert pipelines[0] == CHANGE_STREAM_PIPELINE
+    assert "fullDocument.originalData" not in CHANGE_STREAM_PIPELINE[0]["$project"]
+
+    # A reopened stream continues from the last event seen, not the original start time
+    asyncio.run(bus.watch())
+    assert calls[1]["resume_after"] == {"_data": "token-2"}
+    assert "start_at_operation_time" not in calls[1]
@@ -0,0 +1,96 @@
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+import server
+from benchmarks.fakes import FakeDatabase
+from server import Counter, Histogram, render_metrics
+
+
+def test_render_sums_snapshots_from_other_workers(monkeypatch, tmp_path):
+    requests = Counter("requests_total", "Requests", ("route",))
+    latency = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    monkeypatch.setattr(server, "METRICS", [requests, latency])
+    monkeypatch.setattr(server, "METRICS_MULTIPROC_DIR", str(tmp_path))
+
+    requests.inc(route="/a")
+    latency.observe(0.05)
+    # Another worker (pid 1) saved its metrics earlier
+    (tmp_path / "metrics_1.json").write_text(json.dumps({
+        "requests_total": [[["/a"], 2.0], [["/b"], 1.0]],
+        "latency_seconds": [[[], {"buckets": [0, 1], "sum": 0.5, "count": 2}]],
+    }))
+    # A stale snapshot of this worker must not be counted twice
+    server.write_metrics_snapshot()
+    requests.inc(route="/a")
+
+    lines = render_metrics().splitlines()
+    assert 'requests_total{route="/a"} 4.0' in lines
+    assert 'requests_total{route="/b"} 1.0' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 0.55" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_render_formats_counters_and_cumulative_histograms(monkeypatch):
+    outcomes = Counter("outcomes_total", "Outcomes", ("outcome",))
+    latency = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    monkeypatch.setattr(server, "METRICS", [outcomes, latency])
+    monkeypatch.setattr(server, "METRICS_MULTIPROC_DIR", None)
+
+    outcomes.inc(outcome='say "hi"')
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5.0, route="/a")
+
+    assert render_metrics().splitlines() == [
+        "# HELP outcomes_total Outcomes",
+        "# TYPE outcomes_total counter",
+        'outcomes_total{outcome="say \\"hi\\""} 1.0',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_concurrent_observations_are_not_lost():
+    latency = Histogram("latency_seconds", "Latency")
+    requests = Counter("requests_total", "Requests")
+
+    def work():
+        for _ in range(10000):
+            latency.observe(0.01)
+            requests.inc()
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert latency.samples()[()]["count"] == 40000
+    assert requests.samples()[()] == 40000
+
+
+def test_middleware_labels_requests_by_route_template_and_status(monkeypatch):
+    latency = Histogram("http_request_duration_seconds", "Latency", ("method", "route", "status"))
+    monkeypatch.setattr(server, "HTTP_REQUEST_LATENCY", latency)
+    monkeypatch.setattr(server.invalidation_bus, "mode", "off")
+
+    with TestClient(server.create_app(database=FakeDatabase())) as client:
+        assert client.get("/api/animations/missing").status_code == 404
+        assert client.get("/api/animations").status_code == 200
+        assert client.get("/not-a-route").status_code == 404
+
+    counts = {key: series["count"] for key, series in latency.samples().items()}
+    assert counts == {
+        ("GET", "/api/animations/{animation_id}", "404"): 1,
+        ("GET", "/api/animations", "200"): 1,
+        ("GET", "unmatched", "404"): 1,
+    }
@@ -0,0 +1,133 @@
+from server import SearchIndex, SEARCH_MAX_EXPANSIONS, extract_text_layer_strings
+
+
+def text_layer(text):
+    return {"ty": 5, "t": {"d": {"k": [{"s": {"t": text}, "t": 0}]}}}
+
+
+def animation(animation_id, name, *texts, assets=None):
+    data = {"layers": [text_layer(text) for text in texts]}
+    if assets is not None:
+        data["assets"] = assets
+    return {"id": animation_id, "name": name, "animationData": data}
+
+
+def ids(results):
+    return [animation_id for animation_id, _ in results]
+
+
+def test_extracts_keyframed_legacy_and_precomp_text():
+    data = {
+        "layers": [text_layer("Keyframed"), {"ty": 5, "t": {"d": {"k": {"s": "Legacy"}}}}],
+        "assets": [{"id": "comp_0", "layers": [text_layer("Nested")]}],
+    }
+    assert sorted(extract_text_layer_strings(data)) == ["Keyframed", "Legacy", "Nested"]
+
+
+def test_matches_names_and_text_layers():
+    index = SearchIndex()
+    index.add(animation("a", "Birthday party"))
+    index.add(animation("b", "Promo", "Happy 2019"))
+
+    assert ids(index.search("birthday")) == ["a"]
+    assert ids(index.search("2019")) == ["b"]
+    assert index.search("missing") == []
+
+
+def test_name_matches_rank_above_text_matches():
+    index = SearchIndex()
+    index.add(animation("text", "Promo", "Sale today"))
+    index.add(animation("name", "Sale banner"))
+
+    assert ids(index.search("sale")) == ["name", "text"]
+
+
+def test_exact_match_ranks_above_prefix_and_fuzzy():
+    index = SearchIndex()
+    index.add(animation("fuzzy", "Lunch"))
+    index.add(animation("prefix", "Launcher"))
+    index.add(animation("exact", "Launch"))
+
+    assert ids(index.search("launch")) == ["exact", "prefix", "fuzzy"]
+
+
+def test_prefix_and_fuzzy_can_be_disabled():
+    index = SearchIndex()
+    index.add(animation("a", "Launcher"))
+    index.add(animation("b", "Lunch"))
+
+    assert index.search("launch", prefix=False, fuzzy=False) == []
+    assert ids(index.search("launch", prefix=True, fuzzy=False)) == ["a"]
+    assert ids(index.search("launch", prefix=False, fuzzy=True)) == ["b"]
+
+
+def test_fuzzy_matches_single_edit_only():
+    index = SearchIndex()
+    index.add(animation("a", "Summer"))
+
+    assert ids(index.search("sumer", prefix=False)) == ["a"]   # deletion
+    assert ids(index.search("summmer", prefix=False)) == ["a"]  # insertion
+    assert ids(index.search("sommer", prefix=False)) == ["a"]  # substitution
+    assert index.search("smmr", prefix=False) == []            # two edits
+
+
+def test_fuzzy_skips_short_tokens():
+    index = SearchIndex()
+    index.add(animation("a", "Cat"))
+
+    assert index.search("ca", prefix=False) == []
+
+
+def test_all_query_tokens_must_match():
+    index = SearchIndex()
+    index.add(animation("both", "Summer sale"))
+    index.add(animation("one", "Summer party"))
+
+    assert ids(index.search("summer sale")) == ["both"]
+    assert index.search("summer nothing") == []
+
+
+def test_prefix_expansion_is_capped():
+    index = SearchIndex()
+    for number in range(SEARCH_MAX_EXPANSIONS + 10):
+        index.add(animation(f"id{number:03d}", f"term{number:03d}"))
+
+    assert len(index.search("term", fuzzy=False)) == SEARCH_MAX_EXPANSIONS
+
+
+def test_readding_replaces_previous_terms():
+    index = SearchIndex()
+    index.add(animation("a", "Old name", "Old text"))
+    index.add(animation("a", "New name"))
+
+    assert index.search("old", prefix=False, fuzzy=False) == []
+    assert ids(index.search("new")) == ["a"]
+    assert len(index) == 1
+
+
+def test_remove_cleans_up_vocabulary_and_fuzzy_neighbourhood():
+    index = SearchIndex()
+    index.add(animation("a", "Shared unique"))
+    index.add(animation("b", "Shared"))
+
+    index.remove("a")
+
+    assert index.search("unique") == []
+    assert "unique" not in index.vocabulary
+    assert all("unique" not in terms for terms in index.deletions.values())
+    assert ids(index.search("shared")) == ["b"]
+
+    index.remove("b")
+    assert len(index) == 0
+    assert index.vocabulary == []
+    assert index.postings == {}
+    assert index.deletions == {}
+
+
+def test_remove_unknown_id_is_a_no_op():
+    index = SearchIndex()
+    index.add(animation("a", "Keep"))
+
+    index.remove("missing")
+
+    assert ids(index.search("keep")) == ["a"]